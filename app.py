@@ -1,7 +1,7 @@
 # app.py
 import os
 import json
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for, send_from_directory
+from flask import Flask, render_template, request, jsonify, session, redirect, url_for, send_from_directory, Response, stream_with_context
 from werkzeug.utils import secure_filename
 from datetime import datetime
 from functools import wraps
@@ -9,11 +9,10 @@ from PIL import Image
 import re
 import io
 
-try:
-    import pytesseract
-    TESSERACT_AVAILABLE = True
-except ImportError:
-    TESSERACT_AVAILABLE = False
+import ocr_engine
+from history_query import HistoryIndex, parse_bool, parse_count, parse_hours, parse_time, stream_csv, stream_json
+from plate_snapshot import get_snapshot
+from verification_history import VerificationHistory
 
 # Initialize the Flask application
 app = Flask(__name__)
@@ -62,6 +61,8 @@ def save_verification(plate, is_authorized, filename=None):
     
     with open(VERIFICATION_LOG_FILE, 'w') as f:
         json.dump(data, f, indent=4)
+    # The log was rewritten, so the cached history must be rebuilt on next use
+    _history_cache['key'] = None
 
 def load_verifications():
     """Load all verification records from log."""
@@ -73,10 +74,55 @@ def load_verifications():
     except (json.JSONDecodeError, FileNotFoundError):
         return []
 
+# Compact history shared by requests in this worker, keyed on the log file's mtime/size
+_history_cache = {'key': None, 'history': None, 'index': None}
+
+def load_verification_history():
+    """Load the verification log as a compact VerificationHistory.
+
+    The log is streamed record by record straight into the compact columns,
+    so the full list of dicts is never built. The history is cached per
+    process and only rebuilt when the log file changes, so dashboard requests
+    don't re-parse the JSON every time.
+    """
+    _ensure_verification_log_exists()
+    try:
+        stat = os.stat(VERIFICATION_LOG_FILE)
+        key = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        key = None
+    if key is None or key != _history_cache['key']:
+        try:
+            history = VerificationHistory.from_log_file(VERIFICATION_LOG_FILE)
+        except (json.JSONDecodeError, FileNotFoundError):
+            history = VerificationHistory()
+        _history_cache['history'] = history
+        _history_cache['index'] = None
+        _history_cache['key'] = key
+    return _history_cache['history']
+
+def load_history_index():
+    """Return the plate/time index over the cached history, building it on first use."""
+    history = load_verification_history()
+    if _history_cache['index'] is None or _history_cache['index'].history is not history:
+        _history_cache['index'] = HistoryIndex(history)
+    return _history_cache['index']
+
+def load_vehicle_snapshot():
+    """Return the memory-mapped whitelist snapshot, rebuilding it if the JSON changed.
+
+    Falls back to the parsed JSON list if the database file is missing or the
+    snapshot can't be read or rebuilt (permissions, read-only directory).
+    """
+    try:
+        snapshot = get_snapshot(VEHICLE_DB_FILE)
+    except OSError:
+        snapshot = None
+    return snapshot if snapshot is not None else load_vehicles()
+
 def is_vehicle_authorized(vehicle_number):
     """Check if a vehicle is authorized."""
-    authorized_vehicles = load_vehicles()
-    return vehicle_number.upper() in authorized_vehicles
+    return vehicle_number.upper() in load_vehicle_snapshot()
 
 # --- Authentication Functions ---
 def authenticate_user(username, password):
@@ -112,9 +158,14 @@ def login_required(f):
 
 # --- Core Logic Functions ---
 
-def extract_license_plate_from_image(image_file):
+def extract_license_plate_from_image(image_file, profile=None):
+    """Run OCR on an uploaded image and extract license plates from the text.
+
+    ``profile`` selects the Tesseract settings (see ocr_engine.PROFILES);
+    by default the OCR_PROFILE environment variable is used.
+    """
     try:
-        if not TESSERACT_AVAILABLE:
+        if not ocr_engine.TESSERACT_AVAILABLE:
             return {
                 'success': False,
                 'error': 'Tesseract OCR not installed. Please install it to use OCR functionality.',
@@ -122,21 +173,21 @@ def extract_license_plate_from_image(image_file):
                 'note': 'Tesseract must be installed separately. Visit: https://github.com/UB-Mannheim/tesseract/wiki'
             }
         
-        pytesseract.pytesseract.pytesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
-        
+        profile = ocr_engine.get_profile(profile)
         img = Image.open(image_file)
         img = img.convert('RGB')
-        ocr_text = pytesseract.image_to_string(img)
+        ocr_text = ocr_engine.image_to_string(img, profile)
         license_plates = extract_license_plates_from_text(ocr_text)
         return {
             'success': True,
             'raw_text': ocr_text,
-            'detected_plates': license_plates
+            'detected_plates': license_plates,
+            'profile': profile['name']
         }
-    except FileNotFoundError:
+    except (FileNotFoundError, ocr_engine.TesseractNotFoundError):
         return {
             'success': False,
-            'error': 'Tesseract executable not found at default location. Please install Tesseract OCR.',
+            'error': 'Tesseract executable not found. Install Tesseract OCR, add it to PATH or set TESSERACT_CMD.',
             'detected_plates': [],
             'note': 'Download from: https://github.com/UB-Mannheim/tesseract/wiki'
         }
@@ -169,8 +220,7 @@ def verify_vehicle(license_plate, filename=None):
     Also saves the verification result to the log.
     """
     clean_plate = license_plate.strip().upper().replace(" ", "")
-    authorized_vehicles = load_vehicles()
-    is_authorized = clean_plate in authorized_vehicles
+    is_authorized = clean_plate in load_vehicle_snapshot()
     
     # Save verification result to log
     save_verification(clean_plate, is_authorized, filename)
@@ -201,18 +251,13 @@ def save_image(file, plate, is_authorized):
     return filename
 
 def get_images():
-    """Get list of verification records from verification log"""
+    """Get verification records from verification log, newest first.
+
+    Returns a lazy sequence of (filename, upload_date, plate, is_authorized)
+    tuples built on demand from the compact history.
+    """
     try:
-        verifications = load_verifications()
-        # Convert to format expected by template: (filename, upload_time, plate, is_authorized)
-        images = []
-        for v in reversed(verifications):  # Newest first
-            filename = v.get('filename', 'N/A')
-            timestamp = v.get('timestamp', 'Unknown').split('T')[0]  # Just the date
-            plate = v.get('plate', 'Unknown')
-            is_authorized = v.get('is_authorized', False)
-            images.append((filename, timestamp, plate, is_authorized))
-        return images
+        return load_verification_history().rows(newest_first=True)
     except Exception as e:
         return []
 
@@ -298,8 +343,16 @@ def ocr_extract():
             "detected_plates": []
         }), 400
     
+    profile = request.form.get('profile') or None
+    if profile is not None and profile not in ocr_engine.PROFILES:
+        return jsonify({
+            "success": False,
+            "message": f"Unknown OCR profile: {profile}",
+            "detected_plates": []
+        }), 400
+    
     try:
-        ocr_result = extract_license_plate_from_image(file)
+        ocr_result = extract_license_plate_from_image(file, profile)
         return jsonify(ocr_result)
     except Exception as e:
         return jsonify({
@@ -331,7 +384,49 @@ def gallery():
     API endpoint to fetch all images for gallery display.
     """
     images = get_images()
-    return jsonify(images)
+    return jsonify(list(images))
+
+@app.route('/verifications/query')
+@login_required
+def query_verifications():
+    """
+    API endpoint to query verification history by plate, time range, hour window,
+    authorization status and filename presence. Results are streamed as JSON
+    pages (offset/limit) or as a CSV export.
+    """
+    args = request.args
+    output_format = args.get('format', 'json').lower()
+    try:
+        filters = {
+            "plate": args.get('plate') or None,
+            "start": parse_time(args.get('start')),
+            "end": parse_time(args.get('end')),
+            "hours": parse_hours(args.get('hours')),
+            "is_authorized": parse_bool(args.get('authorized')),
+            "has_filename": parse_bool(args.get('has_file')),
+            "newest_first": bool(parse_bool(args.get('newest_first'))),
+        }
+        offset = parse_count(args.get('offset'), 'offset') or 0
+        if output_format == 'csv':
+            # CSV is meant for full exports, so it is unlimited unless asked otherwise
+            limit = parse_count(args.get('limit'), 'limit')
+        elif output_format == 'json':
+            limit = parse_count(args.get('limit'), 'limit', maximum=1000)
+            if limit is None:
+                limit = 100
+        else:
+            raise ValueError(f"Unsupported format: {output_format!r}")
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    index = load_history_index()
+    if output_format == 'csv':
+        response = Response(stream_with_context(stream_csv(index, offset, limit, **filters)),
+                            mimetype='text/csv')
+        response.headers['Content-Disposition'] = 'attachment; filename=verifications.csv'
+        return response
+    return Response(stream_with_context(stream_json(index, offset, limit, **filters)),
+                    mimetype='application/json')
 
 @app.route('/static/uploads/<path:filename>')
 def uploaded_file(filename):
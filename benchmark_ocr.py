@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+"""
+Benchmark OCR profiles by latency and accuracy.
+
+Runs every selected profile over a folder of images and reports per-image
+latency (mean / p50 / p95), how many images produced a plate, and accuracy
+against known plates. Known plates come from a ``--truth`` JSON file
+(``{"filename": "PLATE", ...}``) or, by default, from the verification log
+entries whose filename exists in the image folder.
+
+Usage:
+    python benchmark_ocr.py
+    python benchmark_ocr.py --profiles default single_line sparse --repeat 3
+    python benchmark_ocr.py --limit 50
+    python benchmark_ocr.py --engine subprocess --truth plates.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import time
+
+from PIL import Image
+
+import ocr_engine
+from app import app, extract_license_plates_from_text, load_verifications
+from reprocess_uploads import find_uploads, positive_int
+
+
+def load_truth(truth_file, filenames):
+    """Map filename -> expected plate for the images being benchmarked."""
+    if truth_file:
+        with open(truth_file, 'r') as f:
+            truth = json.load(f)
+    else:
+        truth = {v['filename']: v['plate'] for v in load_verifications()
+                 if v.get('filename') and v.get('plate')}
+    wanted = set(filenames)
+    return {name: plate.strip().upper().replace(" ", "")
+            for name, plate in truth.items() if name in wanted}
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _load_image(image_folder, name):
+    with Image.open(os.path.join(image_folder, name)) as img:
+        return img.convert('RGB')
+
+
+def benchmark_profile(profile_name, image_folder, filenames, truth, repeat=1):
+    """Run one profile over the images; returns a stats dict."""
+    profile = ocr_engine.get_profile(profile_name)
+    # Warm up once so tesserocr engine initialization isn't counted as latency
+    if filenames:
+        ocr_engine.image_to_string(_load_image(image_folder, filenames[0]), profile)
+
+    latencies = []
+    detected = 0
+    correct = 0
+    for name in filenames:
+        # Decode one image at a time, outside the timed section
+        img = _load_image(image_folder, name)
+        for _ in range(repeat):
+            started = time.perf_counter()
+            text = ocr_engine.image_to_string(img, profile)
+            latencies.append((time.perf_counter() - started) * 1000)
+        plates = extract_license_plates_from_text(text)
+        if plates:
+            detected += 1
+        if name in truth and truth[name] in plates:
+            correct += 1
+
+    return {
+        "profile": profile_name,
+        "images": len(filenames),
+        "mean_ms": statistics.mean(latencies) if latencies else 0.0,
+        "p50_ms": percentile(latencies, 50) if latencies else 0.0,
+        "p95_ms": percentile(latencies, 95) if latencies else 0.0,
+        "detected": detected,
+        "labeled": len(truth),
+        "correct": correct,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare OCR profiles by latency and accuracy.")
+    parser.add_argument('--images', default=app.config['UPLOAD_FOLDER'], help="Folder of images to OCR")
+    parser.add_argument('--profiles', nargs='+', choices=sorted(ocr_engine.PROFILES),
+                        default=list(ocr_engine.PROFILES), help="Profiles to compare")
+    parser.add_argument('--truth', help="JSON file mapping filename to expected plate")
+    parser.add_argument('--repeat', type=positive_int, default=1, help="OCR runs per image (latency averaging)")
+    parser.add_argument('--limit', type=positive_int, default=None, help="Only benchmark the first N images")
+    parser.add_argument('--engine', choices=['auto', 'subprocess'], default=None,
+                        help="Force the backend (default: OCR_ENGINE or auto)")
+    args = parser.parse_args()
+
+    if args.engine:
+        os.environ['OCR_ENGINE'] = args.engine
+    engine = ocr_engine.engine_name()
+    if engine is None:
+        parser.error("No Tesseract binding installed (pip install pytesseract or tesserocr)")
+    if engine == 'pytesseract' and not ocr_engine.find_tesseract():
+        parser.error("tesseract executable not found on PATH (or set TESSERACT_CMD)")
+
+    filenames = find_uploads(args.images)[:args.limit]
+    truth = load_truth(args.truth, filenames)
+
+    print("=" * 78)
+    print(f"OCR PROFILE BENCHMARK ({engine}, tesseract: {ocr_engine.find_tesseract() or 'n/a'})")
+    print(f"{len(filenames)} images, {len(truth)} with known plates, {args.repeat} run(s) per image")
+    print("=" * 78)
+    print(f"{'Profile':<14} | {'Mean ms':>8} | {'p50 ms':>8} | {'p95 ms':>8} | {'Detected':>8} | {'Accuracy':>10}")
+    print("-" * 78)
+    for profile_name in args.profiles:
+        stats = benchmark_profile(profile_name, args.images, filenames, truth, args.repeat)
+        accuracy = f"{stats['correct']}/{stats['labeled']}" if stats['labeled'] else 'n/a'
+        print(f"{stats['profile']:<14} | {stats['mean_ms']:>8.1f} | {stats['p50_ms']:>8.1f} | "
+              f"{stats['p95_ms']:>8.1f} | {stats['detected']:>8} | {accuracy:>10}")
+
+
+if __name__ == '__main__':
+    main()
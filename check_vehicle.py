@@ -2,6 +2,9 @@ import json
 import os
 from datetime import datetime
 
+from plate_snapshot import build_snapshot, get_snapshot, normalize_plate
+from verification_history import VerificationHistory
+
 class VehicleValidator:
     def __init__(self, db_file='vehicle_database.json'):
         """Initialize the vehicle validator with the database file."""
@@ -22,39 +25,54 @@ class VehicleValidator:
         try:
             with open(self.db_file, 'r') as f:
                 data = json.load(f)
-                # Convert all vehicle numbers to uppercase for case-insensitive comparison
-                return [v.upper() for v in data.get('authorized_vehicles', [])]
+                # Normalize like the snapshot does (uppercase, no spaces) so lookups
+                # give the same answer with or without the snapshot
+                return [normalize_plate(v) for v in data.get('authorized_vehicles', [])]
         except (json.JSONDecodeError, FileNotFoundError):
             return []
     
     def _load_history(self):
-        """Load verification history from file."""
+        """Load verification history from file into a compact VerificationHistory."""
+        history = VerificationHistory()
         try:
             if os.path.exists(self.history_file):
                 with open(self.history_file, 'r') as f:
-                    return json.load(f)
+                    for entry in json.load(f):
+                        history.append(entry.get('timestamp'), entry.get('vehicle_number'),
+                                       entry.get('status') == 'AUTHORIZED')
         except (json.JSONDecodeError, FileNotFoundError):
             pass
-        return []
+        return history
+    
+    def _history_entry(self, record):
+        """Convert a VerificationRecord back to the history file's dict format."""
+        timestamp = record.timestamp
+        return {
+            'vehicle_number': record.plate,
+            'status': 'AUTHORIZED' if record.is_authorized else 'UNAUTHORIZED',
+            'timestamp': timestamp.strftime("%Y-%m-%d %H:%M:%S") if timestamp else None,
+            'date': record.date
+        }
     
     def _save_history(self):
         """Save verification history to file."""
         with open(self.history_file, 'w') as f:
-            json.dump(self.verification_history, f, indent=4, default=str)
+            json.dump([self._history_entry(r) for r in self.verification_history], f, indent=4, default=str)
     
     def is_vehicle_authorized(self, vehicle_number):
         """Check if a vehicle number is in the authorized list and log the verification."""
-        is_authorized = vehicle_number.upper() in self.authorized_vehicles
-        
-        # Log this verification
-        verification = {
-            'vehicle_number': vehicle_number.upper(),
-            'status': 'AUTHORIZED' if is_authorized else 'UNAUTHORIZED',
-            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            'date': datetime.now().strftime("%Y-%m-%d")
-        }
+        plate = normalize_plate(vehicle_number)
+        try:
+            snapshot = get_snapshot(self.db_file)
+        except OSError:
+            # Snapshot unreadable or can't be rebuilt here; use the parsed list
+            snapshot = None
+        lookup = snapshot if snapshot is not None else self.authorized_vehicles
+        is_authorized = plate in lookup
         
-        self.verification_history.append(verification)
+        # Log this verification (the date is derived from the timestamp when saved)
+        self.verification_history.append(datetime.now().replace(microsecond=0),
+                                         plate, is_authorized)
         # Keep only the last 100 entries to prevent the file from growing too large
         self.verification_history = self.verification_history[-100:]
         self._save_history()
@@ -64,16 +82,16 @@ class VehicleValidator:
     def add_vehicle(self, vehicle_number):
         """Add a new vehicle number to the authorized list."""
         if not self.is_vehicle_authorized(vehicle_number):
-            self.authorized_vehicles.append(vehicle_number.upper())
+            self.authorized_vehicles.append(normalize_plate(vehicle_number))
             self._save_vehicles()
             return True
         return False
     
     def remove_vehicle(self, vehicle_number):
         """Remove a vehicle number from the authorized list."""
-        vehicle_upper = vehicle_number.upper()
-        if vehicle_upper in self.authorized_vehicles:
-            self.authorized_vehicles.remove(vehicle_upper)
+        plate = normalize_plate(vehicle_number)
+        if plate in self.authorized_vehicles:
+            self.authorized_vehicles.remove(plate)
             self._save_vehicles()
             return True
         return False
@@ -82,6 +100,12 @@ class VehicleValidator:
         """Save the current list of authorized vehicles to the JSON file."""
         with open(self.db_file, 'w') as f:
             json.dump({"authorized_vehicles": sorted(self.authorized_vehicles)}, f, indent=4)
+        # Keep the shared memory-mapped snapshot in step with the JSON file
+        try:
+            build_snapshot(self.db_file)
+        except OSError:
+            # Lookups fall back to the JSON list; get_snapshot retries the rebuild later
+            pass
     
     def get_all_vehicles(self):
         """Get all authorized vehicles."""
@@ -89,7 +113,8 @@ class VehicleValidator:
         
     def get_verification_history(self, limit=10):
         """Get recent verification history."""
-        return self.verification_history[-limit:][::-1]  # Return most recent first
+        recent = self.verification_history[-limit:]
+        return [self._history_entry(r) for r in recent][::-1]  # Return most recent first
 
 def main():
     # Initialize the vehicle validator
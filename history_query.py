@@ -0,0 +1,246 @@
+#!/usr/bin/env python
+"""
+Time-range and plate queries over the verification history.
+
+Answers questions like "when did plate X enter this week" or "all
+unauthorized entries between 2am and 5am" without reading the whole log by
+hand. A ``HistoryIndex`` is built once over a ``VerificationHistory``:
+
+- a secondary index by plate (record indexes in time order per plate)
+- a time-sorted index for range scans (bisect on start/end)
+
+Records without a timestamp only match queries with no time range or hour
+window, listed before the dated ones (after them when newest first).
+
+Matching records are produced lazily, so results can be paginated or streamed
+as JSON/CSV without materializing the full export in memory.
+
+Timestamps in the log are UTC, so date ranges and hour windows are UTC too.
+
+Usage:
+    python history_query.py --plate MH12AB1234 --since 2025-12-01
+    python history_query.py --unauthorized --hours 2-5 --format csv > night.csv
+"""
+
+import argparse
+import csv
+import io
+import itertools
+import json
+import sys
+from array import array
+from bisect import bisect_left
+
+from plate_snapshot import normalize_plate
+from verification_history import MISSING_TIMESTAMP, VerificationHistory, to_epoch_us
+
+_HOUR_US = 3600 * 1000 * 1000
+CSV_FIELDS = ["timestamp", "plate", "is_authorized", "filename"]
+
+
+def parse_time(value):
+    """Parse an ISO date/datetime string into epoch microseconds (None passes through)."""
+    if value is None or value == '':
+        return None
+    ts = to_epoch_us(value)
+    if ts == MISSING_TIMESTAMP:
+        raise ValueError(f"Invalid date/time: {value!r} (expected ISO format, e.g. 2025-12-03T02:00)")
+    return ts
+
+
+def parse_hours(value):
+    """Parse an hour window like '2-5' into (start_hour, end_hour); end is exclusive."""
+    if value is None or value == '':
+        return None
+    try:
+        start, end = (int(part) for part in value.split('-', 1))
+    except ValueError:
+        raise ValueError(f"Invalid hour window: {value!r} (expected e.g. 2-5)")
+    if not (0 <= start <= 23 and 0 <= end <= 24):
+        raise ValueError(f"Invalid hour window: {value!r} (hours must be 0-24)")
+    return start, end
+
+
+def non_negative_int(value):
+    """argparse type for counts that can't be negative (offset/limit)."""
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must not be negative: {value}")
+    return number
+
+
+def parse_count(value, name, maximum=None):
+    """Parse an offset/limit query value, rejecting negatives (None passes through)."""
+    if value is None or value == '':
+        return None
+    try:
+        number = int(value)
+    except ValueError:
+        raise ValueError(f"Invalid {name}: {value!r} (expected a whole number)")
+    if number < 0:
+        raise ValueError(f"{name} must not be negative: {value}")
+    if maximum is not None and number > maximum:
+        raise ValueError(f"{name} must be at most {maximum}: {value}")
+    return number
+
+
+def parse_bool(value):
+    """Parse 'true'/'false' style query values (None passes through)."""
+    if value is None or value == '':
+        return None
+    lowered = str(value).lower()
+    if lowered in ('1', 'true', 'yes', 'y'):
+        return True
+    if lowered in ('0', 'false', 'no', 'n'):
+        return False
+    raise ValueError(f"Invalid boolean: {value!r}")
+
+
+class HistoryIndex:
+    """Plate and time indexes over a VerificationHistory."""
+
+    def __init__(self, history):
+        self.history = history
+        timestamps = [history.timestamp_us(i) for i in range(len(history))]
+
+        # Records without a timestamp can't take part in range scans, so they are
+        # kept apart and only returned when no time filter is given
+        order = sorted((i for i, ts in enumerate(timestamps) if ts != MISSING_TIMESTAMP),
+                       key=timestamps.__getitem__)
+        self._time_order = array('I', order)
+        self._sorted_ts = array('q', (timestamps[i] for i in order))
+        self._undated = array('I', (i for i, ts in enumerate(timestamps) if ts == MISSING_TIMESTAMP))
+
+        self._by_plate = {}
+        for i in order:
+            self._by_plate.setdefault(history.plate(i), array('I')).append(i)
+        self._plate_ts = {plate: array('q', (timestamps[i] for i in indexes))
+                          for plate, indexes in self._by_plate.items()}
+        self._undated_by_plate = {}
+        for i in self._undated:
+            self._undated_by_plate.setdefault(history.plate(i), array('I')).append(i)
+
+    def _candidates(self, plate, start, end, newest_first, include_undated):
+        """Record indexes in time order, narrowed by plate and [start, end)."""
+        if plate is not None:
+            plate = normalize_plate(plate)
+            order = self._by_plate.get(plate, array('I'))
+            ts = self._plate_ts.get(plate, array('q'))
+            undated = self._undated_by_plate.get(plate, array('I'))
+        else:
+            order, ts, undated = self._time_order, self._sorted_ts, self._undated
+        lo = bisect_left(ts, start) if start is not None else 0
+        hi = bisect_left(ts, end) if end is not None else len(ts)
+        positions = range(hi - 1, lo - 1, -1) if newest_first else range(lo, hi)
+        dated = (order[p] for p in positions)
+        if not include_undated or not undated:
+            return dated
+        if newest_first:
+            return itertools.chain(dated, reversed(undated))
+        return itertools.chain(undated, dated)
+
+    def query(self, plate=None, start=None, end=None, hours=None, is_authorized=None,
+              has_filename=None, newest_first=False):
+        """
+        Lazily yield indexes of matching records.
+
+        ``start``/``end`` are epoch microseconds (start inclusive, end exclusive),
+        ``hours`` is a (start_hour, end_hour) UTC window that may wrap midnight.
+        """
+        history = self.history
+        include_undated = start is None and end is None and hours is None
+        for i in self._candidates(plate, start, end, newest_first, include_undated):
+            if is_authorized is not None and history.is_authorized(i) != is_authorized:
+                continue
+            if has_filename is not None and (history.filename(i) is not None) != has_filename:
+                continue
+            if hours is not None:
+                hour = (history.timestamp_us(i) // _HOUR_US) % 24
+                first, last = hours
+                if first <= last:
+                    if not first <= hour < last:
+                        continue
+                elif not (hour >= first or hour < last):
+                    continue
+            yield i
+
+
+def stream_json(index, offset=0, limit=None, **filters):
+    """Yield a JSON document ``{"results": [...], "next_offset": n}`` in chunks."""
+    matches = index.query(**filters)
+    stop = None if limit is None else offset + limit
+    yield '{"results": ['
+    count = 0
+    for i in itertools.islice(matches, offset, stop):
+        yield (',' if count else '') + json.dumps(index.history.record(i).to_dict())
+        count += 1
+    # One lookahead tells whether another page exists
+    has_more = limit is not None and next(matches, None) is not None
+    yield '], "count": %d, "next_offset": %s}' % (count, json.dumps(offset + count if has_more else None))
+
+
+def stream_csv(index, offset=0, limit=None, **filters):
+    """Yield CSV text (header first) for matching records, a row at a time."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_FIELDS)
+    writer.writeheader()
+    stop = None if limit is None else offset + limit
+    for i in itertools.islice(index.query(**filters), offset, stop):
+        writer.writerow(index.history.record(i).to_dict())
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.getvalue():
+        yield buffer.getvalue()
+
+
+def load_history_file(log_file):
+    """Stream a verification_log.json file into a VerificationHistory."""
+    try:
+        return VerificationHistory.from_log_file(log_file)
+    except (json.JSONDecodeError, FileNotFoundError):
+        return VerificationHistory()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the verification history.")
+    parser.add_argument('--log', default='verification_log.json', help="Verification log file")
+    parser.add_argument('--plate', help="Only this plate")
+    parser.add_argument('--since', help="Start date/time, inclusive (ISO, UTC)")
+    parser.add_argument('--until', help="End date/time, exclusive (ISO, UTC)")
+    parser.add_argument('--hours', help="Hour-of-day window in UTC, e.g. 2-5 or 22-6")
+    status = parser.add_mutually_exclusive_group()
+    status.add_argument('--authorized', dest='is_authorized', action='store_const', const=True)
+    status.add_argument('--unauthorized', dest='is_authorized', action='store_const', const=False)
+    files = parser.add_mutually_exclusive_group()
+    files.add_argument('--with-file', dest='has_filename', action='store_const', const=True)
+    files.add_argument('--without-file', dest='has_filename', action='store_const', const=False)
+    parser.add_argument('--newest-first', action='store_true', help="Sort newest records first")
+    parser.add_argument('--offset', type=non_negative_int, default=0, help="Skip this many matches")
+    parser.add_argument('--limit', type=non_negative_int, default=None, help="Return at most this many matches")
+    parser.add_argument('--format', choices=['json', 'csv'], default='json', help="Output format")
+    args = parser.parse_args()
+
+    try:
+        filters = {
+            "plate": args.plate,
+            "start": parse_time(args.since),
+            "end": parse_time(args.until),
+            "hours": parse_hours(args.hours),
+            "is_authorized": args.is_authorized,
+            "has_filename": args.has_filename,
+            "newest_first": args.newest_first,
+        }
+    except ValueError as e:
+        parser.error(str(e))
+
+    index = HistoryIndex(load_history_file(args.log))
+    stream = stream_csv if args.format == 'csv' else stream_json
+    for chunk in stream(index, offset=args.offset, limit=args.limit, **filters):
+        sys.stdout.write(chunk)
+    if args.format == 'json':
+        sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+"""
+Tesseract OCR profiles and engine selection.
+
+Profiles bundle the Tesseract settings used for license plates: page
+segmentation mode (PSM), a character whitelist and the language model. The
+profile is chosen per call or with the ``OCR_PROFILE`` environment variable.
+
+Two backends are supported:
+
+- ``tesserocr`` (optional): an in-process binding. The engine is initialized
+  once per thread and reused between calls, avoiding the cost of starting a
+  ``tesseract`` subprocess for every image.
+- ``pytesseract``: runs the ``tesseract`` executable as a subprocess. The
+  executable is found through ``TESSERACT_CMD``, the PATH, or the default
+  Windows install location.
+
+Set ``OCR_ENGINE`` to ``subprocess`` to force pytesseract even if tesserocr is
+installed.
+"""
+
+import os
+import shutil
+import threading
+
+try:
+    import pytesseract
+    PYTESSERACT_AVAILABLE = True
+except ImportError:
+    PYTESSERACT_AVAILABLE = False
+
+try:
+    import tesserocr
+    TESSEROCR_AVAILABLE = True
+except ImportError:
+    TESSEROCR_AVAILABLE = False
+
+TESSERACT_AVAILABLE = PYTESSERACT_AVAILABLE or TESSEROCR_AVAILABLE
+# Raised when the tesseract executable can't be started
+TesseractNotFoundError = pytesseract.TesseractNotFoundError if PYTESSERACT_AVAILABLE else FileNotFoundError
+
+PLATE_CHARACTERS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'
+WINDOWS_TESSERACT_PATH = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+
+# psm: 3 = fully automatic page segmentation, 6 = single uniform block of text,
+#      7 = single text line, 11 = sparse text
+PROFILES = {
+    'default': {
+        'description': 'Tesseract defaults: full page segmentation, full dictionary',
+        'psm': 3,
+        'whitelist': None,
+        'lang': 'eng',
+    },
+    'single_line': {
+        'description': 'Cropped plate: single text line, A-Z0-9 only',
+        'psm': 7,
+        'whitelist': PLATE_CHARACTERS,
+        'lang': 'eng',
+    },
+    'single_block': {
+        'description': 'Two-row plates: single text block, A-Z0-9 only',
+        'psm': 6,
+        'whitelist': PLATE_CHARACTERS,
+        'lang': 'eng',
+    },
+    'sparse': {
+        'description': 'Full vehicle photo: sparse text, A-Z0-9 only',
+        'psm': 11,
+        'whitelist': PLATE_CHARACTERS,
+        'lang': 'eng',
+    },
+}
+DEFAULT_PROFILE = 'default'
+
+
+def find_tesseract():
+    """Locate the tesseract executable: TESSERACT_CMD, then PATH, then the Windows default."""
+    configured = os.getenv('TESSERACT_CMD')
+    if configured:
+        return configured
+    on_path = shutil.which('tesseract')
+    if on_path:
+        return on_path
+    if os.path.exists(WINDOWS_TESSERACT_PATH):
+        return WINDOWS_TESSERACT_PATH
+    return None
+
+
+def get_profile(name=None, lang=None):
+    """
+    Return the settings for profile ``name`` (default: OCR_PROFILE or 'default').
+    ``lang`` (or OCR_LANG) overrides the profile's language model, e.g. 'eng+hin'.
+    """
+    name = name or os.getenv('OCR_PROFILE', DEFAULT_PROFILE)
+    if name not in PROFILES:
+        raise ValueError(f"Unknown OCR profile: {name!r} (choose from {', '.join(PROFILES)})")
+    profile = dict(PROFILES[name], name=name)
+    lang = lang or os.getenv('OCR_LANG')
+    if lang:
+        profile['lang'] = lang
+    return profile
+
+
+def build_config(profile):
+    """Build the tesseract command-line config string for a profile."""
+    config = f"--psm {profile['psm']}"
+    if profile['whitelist']:
+        # Dictionaries only pull OCR towards words, which plates are not
+        config += f" -c tessedit_char_whitelist={profile['whitelist']}"
+        config += " -c load_system_dawg=0 -c load_freq_dawg=0"
+    return config
+
+
+def engine_name():
+    """Return the backend used for OCR: 'tesserocr', 'pytesseract' or None."""
+    if TESSEROCR_AVAILABLE and os.getenv('OCR_ENGINE', 'auto') != 'subprocess':
+        return 'tesserocr'
+    if PYTESSERACT_AVAILABLE:
+        return 'pytesseract'
+    return None
+
+
+if PYTESSERACT_AVAILABLE:
+    _tesseract_cmd = find_tesseract()
+    if _tesseract_cmd:
+        pytesseract.pytesseract.tesseract_cmd = _tesseract_cmd
+
+# tesserocr APIs are not thread safe, so each thread keeps its own, initialized
+# once per (language, dictionary) combination and reused between calls
+_thread_state = threading.local()
+
+
+def _tesserocr_api(lang, use_dictionary):
+    apis = getattr(_thread_state, 'apis', None)
+    if apis is None:
+        apis = _thread_state.apis = {}
+    key = (lang, use_dictionary)
+    api = apis.get(key)
+    if api is None:
+        api = tesserocr.PyTessBaseAPI(init=False)
+        # Dictionary loading can only be switched off at init time
+        variables = None if use_dictionary else {'load_system_dawg': '0', 'load_freq_dawg': '0'}
+        api.Init(lang=lang, variables=variables)
+        apis[key] = api
+    return api
+
+
+def image_to_string(img, profile=None):
+    """Run OCR on a PIL image with the given profile (a name or get_profile() dict)."""
+    if profile is None or isinstance(profile, str):
+        profile = get_profile(profile)
+
+    engine = engine_name()
+    if engine == 'tesserocr':
+        api = _tesserocr_api(profile['lang'], use_dictionary=not profile['whitelist'])
+        api.SetPageSegMode(profile['psm'])
+        api.SetVariable('tessedit_char_whitelist', profile['whitelist'] or '')
+        api.SetImage(img)
+        return api.GetUTF8Text()
+    if engine == 'pytesseract':
+        return pytesseract.image_to_string(img, lang=profile['lang'], config=build_config(profile))
+    raise RuntimeError('No Tesseract binding installed (pytesseract or tesserocr)')
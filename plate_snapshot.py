@@ -0,0 +1,220 @@
+#!/usr/bin/env python
+"""
+Compiled, memory-mapped snapshot of the authorized vehicle whitelist.
+
+``vehicle_database.json`` is compiled into a small binary file next to it
+(``vehicle_database.snap``) which every process opens with ``mmap``. The
+operating system shares the mapped pages between gunicorn workers, so there is
+no per-worker parsed copy of the whitelist and opening it is near-instant.
+
+File layout (little endian):
+
+    header   magic, plate width, plate count, bloom bits, bloom hashes,
+             source mtime (ns), source size
+    bloom    bloom_bits / 8 bytes (optional, bloom_bits may be 0)
+    plates   count * width bytes, normalized plates sorted and NUL padded
+
+Lookups go through the Bloom filter first and then a binary search over the
+fixed-width plate table. The snapshot is rebuilt atomically (write to a temp
+file, then ``os.replace``) whenever the JSON database changes.
+
+Usage:
+    python plate_snapshot.py [vehicle_database.json]
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from hashlib import blake2b
+
+MAGIC = b'PLATESN1'
+HEADER = struct.Struct('<8sIIIIqq')
+BLOOM_BITS_PER_PLATE = 10
+BLOOM_HASHES = 7
+
+
+def normalize_plate(plate):
+    """Normalize a plate the same way verify_vehicle does."""
+    return plate.strip().upper().replace(" ", "")
+
+
+def snapshot_path_for(db_file):
+    """Return the snapshot path used for a given JSON database file."""
+    return os.path.splitext(db_file)[0] + '.snap'
+
+
+def _bloom_positions(key, bloom_bits, hashes):
+    """Bit positions for ``key`` using double hashing over one blake2b digest."""
+    digest = blake2b(key, digest_size=16).digest()
+    h1 = int.from_bytes(digest[:8], 'little')
+    h2 = int.from_bytes(digest[8:], 'little') | 1
+    return [(h1 + k * h2) % bloom_bits for k in range(hashes)]
+
+
+def _source_key(db_file):
+    stat = os.stat(db_file)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def build_snapshot(db_file, snapshot_file=None, bloom=True):
+    """
+    Compile the JSON whitelist into a snapshot file, atomically replacing any
+    previous snapshot. Returns the snapshot path.
+    """
+    snapshot_file = snapshot_file or snapshot_path_for(db_file)
+    source_mtime, source_size = _source_key(db_file)
+    try:
+        with open(db_file, 'r') as f:
+            vehicles = json.load(f).get('authorized_vehicles', [])
+    except json.JSONDecodeError:
+        vehicles = []
+
+    plates = sorted({normalize_plate(v).encode('utf-8') for v in vehicles} - {b''})
+    width = max((len(p) for p in plates), default=1)
+
+    bloom_bits = 0
+    bloom_bytes = bytearray()
+    if bloom and plates:
+        # Round up to whole bytes so the bit array maps cleanly onto the file
+        bloom_bits = max(64, (len(plates) * BLOOM_BITS_PER_PLATE + 7) // 8 * 8)
+        bloom_bytes = bytearray(bloom_bits // 8)
+        for p in plates:
+            for pos in _bloom_positions(p, bloom_bits, BLOOM_HASHES):
+                bloom_bytes[pos >> 3] |= 1 << (pos & 7)
+
+    directory = os.path.dirname(os.path.abspath(snapshot_file))
+    fd, tmp_path = tempfile.mkstemp(prefix='.snap-', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, width, len(plates), bloom_bits,
+                                BLOOM_HASHES if bloom_bits else 0, source_mtime, source_size))
+            f.write(bloom_bytes)
+            for p in plates:
+                f.write(p.ljust(width, b'\0'))
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates the file as 0600; workers may run as another user
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, snapshot_file)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    # Drop this process's cached mapping so the next lookup reopens the new file.
+    # It is not closed: other threads may still hold it, and GC unmaps it once unused.
+    _open_snapshots.pop(os.path.abspath(snapshot_file), None)
+    return snapshot_file
+
+
+class PlateSnapshot:
+    """Read-only, memory-mapped view of a compiled whitelist snapshot."""
+
+    def __init__(self, snapshot_file):
+        self.path = snapshot_file
+        with open(snapshot_file, 'rb') as f:
+            self.inode = os.fstat(f.fileno()).st_ino
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, self.width, self.count, self.bloom_bits, self.bloom_hashes,
+         source_mtime, source_size) = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self._mm.close()
+            raise ValueError(f"{snapshot_file} is not a plate snapshot")
+        self.source_key = (source_mtime, source_size)
+        self._bloom_offset = HEADER.size
+        self._plates_offset = HEADER.size + self.bloom_bits // 8
+
+    def close(self):
+        self._mm.close()
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self._plate_at(i).rstrip(b'\0').decode('utf-8')
+
+    def _plate_at(self, i):
+        offset = self._plates_offset + i * self.width
+        return self._mm[offset:offset + self.width]
+
+    def _maybe_contains(self, key):
+        if not self.bloom_bits:
+            return True
+        mm = self._mm
+        base = self._bloom_offset
+        for pos in _bloom_positions(key, self.bloom_bits, self.bloom_hashes):
+            if not mm[base + (pos >> 3)] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def __contains__(self, plate):
+        key = normalize_plate(plate).encode('utf-8')
+        if not key or len(key) > self.width or not self._maybe_contains(key):
+            return False
+        key = key.ljust(self.width, b'\0')
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            current = self._plate_at(mid)
+            if current < key:
+                lo = mid + 1
+            elif current > key:
+                hi = mid
+            else:
+                return True
+        return False
+
+
+# Per-process cache of open snapshots, keyed by absolute snapshot path
+_open_snapshots = {}
+
+
+def get_snapshot(db_file, snapshot_file=None):
+    """
+    Return an open PlateSnapshot for ``db_file``, rebuilding the snapshot if it
+    is missing or older than the JSON database. Returns None if the database
+    does not exist.
+    """
+    snapshot_file = snapshot_file or snapshot_path_for(db_file)
+    cache_key = os.path.abspath(snapshot_file)
+    try:
+        source_key = _source_key(db_file)
+    except FileNotFoundError:
+        return None
+
+    snapshot = _open_snapshots.get(cache_key)
+    if snapshot is not None:
+        try:
+            current_inode = os.stat(snapshot_file).st_ino
+        except FileNotFoundError:
+            current_inode = None
+        if snapshot.source_key == source_key and snapshot.inode == current_inode:
+            return snapshot
+        # Another process rebuilt the snapshot, or the database changed. Leave the
+        # old mapping open for threads still using it; GC unmaps it later.
+        _open_snapshots.pop(cache_key, None)
+
+    try:
+        snapshot = PlateSnapshot(snapshot_file)
+    except (FileNotFoundError, ValueError, struct.error):
+        snapshot = None
+    if snapshot is None or snapshot.source_key != source_key:
+        if snapshot is not None:
+            snapshot.close()
+        build_snapshot(db_file, snapshot_file)
+        snapshot = PlateSnapshot(snapshot_file)
+    _open_snapshots[cache_key] = snapshot
+    return snapshot
+
+
+if __name__ == '__main__':
+    db_file = sys.argv[1] if len(sys.argv) > 1 else 'vehicle_database.json'
+    path = build_snapshot(db_file)
+    snapshot = PlateSnapshot(path)
+    print(f"Compiled {len(snapshot)} plates from {db_file} into {path} "
+          f"(width {snapshot.width}, bloom {snapshot.bloom_bits} bits)")
+    snapshot.close()
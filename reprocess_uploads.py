@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+"""
+Offline batch reprocessing of archived uploads.
+
+Re-runs OCR over every image in the upload folder, re-checks the detected
+plates against the current vehicle database and writes the refreshed results
+to a separate results store (JSON lines). Progress is recorded in a checkpoint
+file so an interrupted run can be resumed where it stopped.
+
+Usage:
+    python reprocess_uploads.py
+    python reprocess_uploads.py --workers 8 --results reprocess_results.jsonl
+    python reprocess_uploads.py --profile sparse --restart
+"""
+
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+from multiprocessing import Pool, cpu_count
+
+from app import (
+    app,
+    extract_license_plate_from_image,
+    load_vehicle_snapshot,
+    load_verifications,
+)
+from ocr_engine import PROFILES
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.bmp', '.gif', '.tif', '.tiff')
+DEFAULT_RESULTS_FILE = 'reprocess_results.jsonl'
+DEFAULT_CHECKPOINT_FILE = 'reprocess_checkpoint.txt'
+
+# Set once per worker process by _init_worker
+_authorized_vehicles = None
+
+
+def _init_worker():
+    """Open the whitelist snapshot once per worker instead of once per image."""
+    global _authorized_vehicles
+    # Tesseract starts one OpenMP thread per core by default; with a worker per
+    # core that oversubscribes the CPU, so keep each worker single-threaded
+    os.environ.setdefault('OMP_THREAD_LIMIT', '1')
+    _authorized_vehicles = load_vehicle_snapshot()
+
+
+def find_uploads(upload_folder):
+    """Return the sorted list of image filenames in the upload folder."""
+    try:
+        names = os.listdir(upload_folder)
+    except FileNotFoundError:
+        return []
+    return sorted(
+        name for name in names
+        if name.lower().endswith(IMAGE_EXTENSIONS)
+        and os.path.isfile(os.path.join(upload_folder, name))
+    )
+
+
+def load_checkpoint(checkpoint_file):
+    """Return the set of filenames successfully processed by a previous run."""
+    try:
+        with open(checkpoint_file, 'r') as f:
+            return {line.strip() for line in f if line.strip()}
+    except FileNotFoundError:
+        return set()
+
+
+def load_previous_decisions():
+    """Map filename -> last logged authorization decision from the verification log."""
+    decisions = {}
+    for v in load_verifications():
+        filename = v.get('filename')
+        if filename:
+            decisions[filename] = bool(v.get('is_authorized', False))
+    return decisions
+
+
+def process_upload(task):
+    """Run OCR on one archived image and check the result against the whitelist."""
+    upload_folder, filename, profile = task
+    started = time.perf_counter()
+    path = os.path.join(upload_folder, filename)
+    if os.path.isfile(path):
+        ocr_result = extract_license_plate_from_image(path, profile)
+    else:
+        # Deleted after the folder was listed; don't let OCR report it as a missing Tesseract
+        ocr_result = {'success': False, 'error': f'Image not found: {filename}', 'detected_plates': []}
+    plates = ocr_result.get('detected_plates', [])
+    authorized_plates = [p for p in plates if p in _authorized_vehicles]
+    return {
+        "filename": filename,
+        "processed_at": datetime.utcnow().isoformat(),
+        "success": ocr_result.get('success', False),
+        "error": ocr_result.get('error'),
+        "raw_text": ocr_result.get('raw_text', ''),
+        "detected_plates": plates,
+        "plate": authorized_plates[0] if authorized_plates else (plates[0] if plates else None),
+        "is_authorized": bool(authorized_plates),
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+def reprocess(upload_folder, results_file, checkpoint_file, workers=None, chunksize=4, profile=None):
+    """
+    Reprocess all pending uploads and append the results to the results store.
+    Returns a summary dict with counts, throughput and changed decisions.
+    """
+    done = load_checkpoint(checkpoint_file)
+    pending = [name for name in find_uploads(upload_folder) if name not in done]
+    previous = load_previous_decisions()
+    if workers is None:
+        workers = cpu_count()
+
+    summary = {
+        "pending": len(pending),
+        "skipped": len(done),
+        "processed": 0,
+        "failed": 0,
+        "changed": [],
+        "workers": workers,
+    }
+    if not pending:
+        summary["elapsed_s"] = 0.0
+        summary["images_per_s"] = 0.0
+        return summary
+
+    started = time.perf_counter()
+    tasks = [(upload_folder, name, profile) for name in pending]
+    with open(results_file, 'a') as results, open(checkpoint_file, 'a') as checkpoint, \
+            Pool(processes=workers, initializer=_init_worker) as pool:
+        for result in pool.imap_unordered(process_upload, tasks, chunksize=chunksize):
+            filename = result["filename"]
+            if filename in previous:
+                result["previous_is_authorized"] = previous[filename]
+            if not result["success"]:
+                summary["failed"] += 1
+            elif filename in previous and previous[filename] != result["is_authorized"]:
+                summary["changed"].append(filename)
+            results.write(json.dumps(result) + '\n')
+            results.flush()
+            # Only checkpoint successes, once safely in the results store, so
+            # failed images are retried on the next run
+            if result["success"]:
+                checkpoint.write(filename + '\n')
+                checkpoint.flush()
+            summary["processed"] += 1
+
+    elapsed = time.perf_counter() - started
+    summary["elapsed_s"] = round(elapsed, 3)
+    summary["images_per_s"] = round(summary["processed"] / elapsed, 2) if elapsed else 0.0
+    return summary
+
+
+def positive_int(value):
+    """argparse type for options that must be at least 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1: {value}")
+    return number
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-run OCR and verification over archived uploads.")
+    parser.add_argument('--uploads', default=app.config['UPLOAD_FOLDER'], help="Upload folder to scan")
+    parser.add_argument('--results', default=DEFAULT_RESULTS_FILE, help="Results store (JSON lines)")
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT_FILE, help="Checkpoint file for resuming")
+    parser.add_argument('--workers', type=positive_int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--chunksize', type=positive_int, default=4, help="Images handed to a worker at a time")
+    parser.add_argument('--profile', choices=sorted(PROFILES), default=None,
+                        help="OCR profile (default: OCR_PROFILE or 'default')")
+    parser.add_argument('--restart', action='store_true', help="Ignore the checkpoint and start over")
+    args = parser.parse_args()
+
+    if args.restart:
+        for path in (args.checkpoint, args.results):
+            if os.path.exists(path):
+                os.remove(path)
+
+    summary = reprocess(args.uploads, args.results, args.checkpoint, args.workers, args.chunksize,
+                        args.profile)
+
+    print("=" * 60)
+    print("REPROCESSING SUMMARY")
+    print("=" * 60)
+    print(f"  Already done (checkpoint): {summary['skipped']}")
+    print(f"  Processed this run:        {summary['processed']} / {summary['pending']}")
+    print(f"  OCR failures:              {summary['failed']}")
+    print(f"  Workers:                   {summary['workers']}")
+    print(f"  Elapsed:                   {summary['elapsed_s']}s")
+    print(f"  Throughput:                {summary['images_per_s']} images/s")
+    print(f"  Changed decisions:         {len(summary['changed'])}")
+    for filename in summary['changed']:
+        print(f"    - {filename}")
+
+
+if __name__ == '__main__':
+    main()
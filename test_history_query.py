@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+"""
+Test script for the verification history query engine.
+"""
+
+import csv
+import io
+import json
+
+from app import app
+from history_query import HistoryIndex, parse_hours, parse_time, stream_csv, stream_json
+from verification_history import VerificationHistory
+
+RECORDS = [
+    {"timestamp": "2025-12-01T01:30:00", "plate": "MH12AB1234", "is_authorized": True, "filename": "a.jpg"},
+    {"timestamp": "2025-12-01T03:10:00", "plate": "XX99YY5555", "is_authorized": False, "filename": None},
+    {"timestamp": "2025-12-03T04:45:00", "plate": "XX99YY5555", "is_authorized": False, "filename": "b.jpg"},
+    {"timestamp": "2025-12-02T12:00:00", "plate": "MH12AB1234", "is_authorized": True, "filename": "c.jpg"},
+    {"timestamp": "2025-12-08T02:15:00", "plate": "DL5CAB1234", "is_authorized": False, "filename": "d.jpg"},
+]
+
+def plates(index, **filters):
+    return [index.history.plate(i) for i in index.query(**filters)]
+
+def test_history_query():
+    print("=" * 50)
+    print("HISTORY QUERY TEST")
+    print("=" * 50)
+
+    index = HistoryIndex(VerificationHistory.from_records(RECORDS))
+
+    # Test 1: Plate lookup in time order
+    print("\n[TEST 1] When did MH12AB1234 enter?")
+    times = [index.history.record(i).timestamp.isoformat() for i in index.query(plate="mh12ab1234")]
+    print(f"  {times}")
+    assert times == ["2025-12-01T01:30:00", "2025-12-02T12:00:00"]
+
+    # Test 2: Time range
+    print("\n[TEST 2] Entries between 2025-12-01 and 2025-12-03...")
+    result = plates(index, start=parse_time("2025-12-01"), end=parse_time("2025-12-03"))
+    print(f"  {result}")
+    assert result == ["MH12AB1234", "XX99YY5555", "MH12AB1234"]
+
+    # Test 3: Unauthorized entries between 2am and 5am
+    print("\n[TEST 3] Unauthorized entries between 2am and 5am...")
+    result = plates(index, hours=parse_hours("2-5"), is_authorized=False)
+    print(f"  {result}")
+    assert result == ["XX99YY5555", "XX99YY5555", "DL5CAB1234"]
+
+    # Test 4: Filename presence and newest first
+    print("\n[TEST 4] Entries without an image, and newest first...")
+    assert plates(index, has_filename=False) == ["XX99YY5555"]
+    assert plates(index, newest_first=True)[0] == "DL5CAB1234"
+    print("  ✓ OK")
+
+    # Test 5: Paginated JSON stream
+    print("\n[TEST 5] Paginated JSON...")
+    page = json.loads(''.join(stream_json(index, offset=0, limit=2)))
+    print(f"  count={page['count']} next_offset={page['next_offset']}")
+    assert page['count'] == 2 and page['next_offset'] == 2
+    last = json.loads(''.join(stream_json(index, offset=4, limit=2)))
+    assert last['count'] == 1 and last['next_offset'] is None
+
+    # Test 6: CSV export
+    print("\n[TEST 6] CSV export...")
+    rows = list(csv.DictReader(io.StringIO(''.join(stream_csv(index, is_authorized=True)))))
+    print(f"  {len(rows)} rows")
+    assert [r['filename'] for r in rows] == ["a.jpg", "c.jpg"]
+
+    # Test 7: Records without a timestamp
+    print("\n[TEST 7] Records without a timestamp...")
+    undated = HistoryIndex(VerificationHistory.from_records(RECORDS + [
+        {"timestamp": None, "plate": "MH12AB1234", "is_authorized": True, "filename": None},
+        {"timestamp": "Unknown", "plate": "KA01ZZ0001", "is_authorized": False, "filename": None},
+    ]))
+    assert list(undated.query(plate="mh12 ab1234")) == [5, 0, 3]
+    assert list(undated.query(plate="MH12AB1234", newest_first=True)) == [3, 0, 5]
+    assert plates(undated, plate="KA01ZZ0001") == ["KA01ZZ0001"]
+    assert len(list(undated.query())) == 7
+    # Time filters never match them
+    assert plates(undated, plate="KA01ZZ0001", start=parse_time("2000-01-01")) == []
+    assert plates(undated, plate="KA01ZZ0001", hours=(0, 24)) == []
+    print("  ✓ Only returned without a time filter")
+
+    # Test 8: API rejects bad offset/limit instead of clamping
+    print("\n[TEST 8] Invalid offset/limit...")
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['user_id'] = 1
+    for query in ["offset=-1", "limit=-5", "limit=1001", "limit=abc", "format=csv&limit=-1",
+                  "format=csv&offset=-3"]:
+        response = client.get(f"/verifications/query?{query}")
+        print(f"  {query:<22} -> {response.status_code} {response.get_json()['message']}")
+        assert response.status_code == 400
+
+    print("\n" + "=" * 50)
+    print("ALL TESTS COMPLETED SUCCESSFULLY!")
+    print("=" * 50)
+
+if __name__ == '__main__':
+    test_history_query()
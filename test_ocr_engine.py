@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+"""
+Test script for OCR profiles and engine selection.
+"""
+
+import io
+import os
+from unittest import mock
+
+import ocr_engine
+from app import app
+from ocr_engine import build_config, engine_name, find_tesseract, get_profile
+
+def test_ocr_engine():
+    print("=" * 50)
+    print("OCR ENGINE TEST")
+    print("=" * 50)
+
+    # Test 1: Profile lookup and overrides
+    print("\n[TEST 1] Profiles...")
+    with mock.patch.dict(os.environ, {}, clear=True):
+        profile = get_profile()
+        assert profile['name'] == 'default' and profile['psm'] == 3 and profile['lang'] == 'eng'
+        assert get_profile('sparse')['psm'] == 11
+        try:
+            get_profile('bogus')
+            assert False, "unknown profile accepted"
+        except ValueError as e:
+            print(f"  Unknown profile: {e}")
+    with mock.patch.dict(os.environ, {'OCR_PROFILE': 'single_line', 'OCR_LANG': 'eng+hin'}):
+        profile = get_profile()
+        assert profile['name'] == 'single_line' and profile['lang'] == 'eng+hin'
+        assert get_profile('sparse', lang='hin')['lang'] == 'hin'
+    # Overrides never leak into the shared table
+    assert ocr_engine.PROFILES['single_line']['lang'] == 'eng'
+
+    # Test 2: Tesseract config strings
+    print("\n[TEST 2] Building configs...")
+    default_config = build_config(get_profile('default'))
+    line_config = build_config(get_profile('single_line'))
+    print(f"  default:     {default_config}")
+    print(f"  single_line: {line_config}")
+    assert default_config == "--psm 3"
+    assert line_config.startswith("--psm 7 ")
+    assert f"tessedit_char_whitelist={ocr_engine.PLATE_CHARACTERS}" in line_config
+    assert "load_system_dawg=0" in line_config and "load_freq_dawg=0" in line_config
+
+    # Test 3: Locating the tesseract executable
+    print("\n[TEST 3] Finding tesseract...")
+    with mock.patch('shutil.which', return_value='/usr/bin/tesseract'), \
+            mock.patch('os.path.exists', return_value=True):
+        with mock.patch.dict(os.environ, {'TESSERACT_CMD': '/opt/tesseract'}):
+            assert find_tesseract() == '/opt/tesseract'
+        with mock.patch.dict(os.environ, {}, clear=True):
+            assert find_tesseract() == '/usr/bin/tesseract'
+    with mock.patch.dict(os.environ, {}, clear=True), mock.patch('shutil.which', return_value=None):
+        with mock.patch('os.path.exists', return_value=True):
+            assert find_tesseract() == ocr_engine.WINDOWS_TESSERACT_PATH
+        with mock.patch('os.path.exists', return_value=False):
+            assert find_tesseract() is None
+    print("  ✓ TESSERACT_CMD, then PATH, then the Windows default")
+
+    # Test 4: Engine selection
+    print("\n[TEST 4] Selecting the engine...")
+    with mock.patch.object(ocr_engine, 'TESSEROCR_AVAILABLE', True), \
+            mock.patch.object(ocr_engine, 'PYTESSERACT_AVAILABLE', True):
+        with mock.patch.dict(os.environ, {'OCR_ENGINE': 'auto'}):
+            assert engine_name() == 'tesserocr'
+        with mock.patch.dict(os.environ, {'OCR_ENGINE': 'subprocess'}):
+            assert engine_name() == 'pytesseract'
+    with mock.patch.object(ocr_engine, 'TESSEROCR_AVAILABLE', False), \
+            mock.patch.object(ocr_engine, 'PYTESSERACT_AVAILABLE', False):
+        assert engine_name() is None
+    print("  ✓ OCR_ENGINE=subprocess forces pytesseract")
+
+    # Test 5: /ocr rejects unknown profiles
+    print("\n[TEST 5] /ocr with an unknown profile...")
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['user_id'] = 1
+    response = client.post('/ocr', data={'image': (io.BytesIO(b'x'), 'car.jpg'), 'profile': 'bogus'},
+                           content_type='multipart/form-data')
+    print(f"  {response.status_code} {response.get_json()['message']}")
+    assert response.status_code == 400
+    assert response.get_json()['message'] == "Unknown OCR profile: bogus"
+
+    print("\n" + "=" * 50)
+    print("ALL TESTS COMPLETED SUCCESSFULLY!")
+    print("=" * 50)
+
+if __name__ == '__main__':
+    test_ocr_engine()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""
+Test script for the memory-mapped whitelist snapshot.
+"""
+
+import json
+import os
+import tempfile
+from unittest import mock
+
+import check_vehicle
+from check_vehicle import VehicleValidator
+from plate_snapshot import build_snapshot, get_snapshot, PlateSnapshot
+
+def test_plate_snapshot():
+    print("=" * 50)
+    print("PLATE SNAPSHOT TEST")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, 'vehicles.json')
+        with open(db_file, 'w') as f:
+            json.dump({"authorized_vehicles": ["MH12AB1234", "dl5cab1234", "M2346021"]}, f)
+
+        # Test 1: Compile snapshot
+        print("\n[TEST 1] Compiling snapshot...")
+        path = build_snapshot(db_file)
+        assert os.stat(path).st_mode & 0o777 == 0o644
+        snapshot = PlateSnapshot(path)
+        print(f"  Plates: {len(snapshot)} | Width: {snapshot.width} | Bloom bits: {snapshot.bloom_bits}")
+        assert len(snapshot) == 3
+        assert list(snapshot) == sorted(["MH12AB1234", "DL5CAB1234", "M2346021"])
+        snapshot.close()
+
+        # Test 2: Lookups
+        print("\n[TEST 2] Checking lookups...")
+        snapshot = get_snapshot(db_file)
+        for plate, expected in [("MH12AB1234", True), ("mh12 ab1234", True), ("M2346021", True),
+                                ("XX99YY1234", False), ("M234602", False), ("", False),
+                                ("MH12AB1234567", False)]:
+            result = plate in snapshot
+            print(f"  {plate!r:<18} -> {'✓ AUTHORIZED' if result else '✗ UNAUTHORIZED'}")
+            assert result == expected
+
+        # Test 3: Snapshot is rebuilt when the JSON changes
+        print("\n[TEST 3] Updating database...")
+        with open(db_file, 'w') as f:
+            json.dump({"authorized_vehicles": ["UP70BD4567", "RJ14CD5678"]}, f)
+        os.utime(db_file, ns=(0, 0))
+        snapshot = get_snapshot(db_file)
+        print(f"  Plates after update: {list(snapshot)}")
+        assert "UP70BD4567" in snapshot
+        assert "MH12AB1234" not in snapshot
+
+        # Test 4: A snapshot held by another thread keeps working after a rebuild
+        print("\n[TEST 4] Rebuilding while a snapshot is in use...")
+        held = get_snapshot(db_file)
+        build_snapshot(db_file)
+        assert "UP70BD4567" in held
+        assert "UP70BD4567" in get_snapshot(db_file)
+        print("  ✓ Old snapshot still readable")
+
+        # Test 5: VehicleValidator add/remove/lookup agree on normalized plates
+        print("\n[TEST 5] VehicleValidator with spaced plates...")
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            validator = VehicleValidator(db_file)
+            assert validator.add_vehicle("dl 5c ab 1234")
+            assert "DL5CAB1234" in validator.get_all_vehicles()
+            assert validator.is_vehicle_authorized("DL5CAB1234")
+            assert not validator.add_vehicle("DL5CAB1234")
+            # Same answer when the snapshot can't be opened
+            with mock.patch.object(check_vehicle, 'get_snapshot', side_effect=PermissionError):
+                assert validator.is_vehicle_authorized("dl5c ab1234")
+            assert validator.remove_vehicle("DL5CAB1234")
+            assert not validator.is_vehicle_authorized("DL 5C AB 1234")
+            print("  ✓ Add, lookup and remove agree")
+        finally:
+            os.chdir(cwd)
+
+    print("\n" + "=" * 50)
+    print("ALL TESTS COMPLETED SUCCESSFULLY!")
+    print("=" * 50)
+
+if __name__ == '__main__':
+    test_plate_snapshot()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+"""
+Test script for offline reprocessing of archived uploads.
+"""
+
+import json
+import os
+import tempfile
+from unittest import mock
+
+import reprocess_uploads
+from reprocess_uploads import find_uploads, load_checkpoint, process_upload, reprocess
+
+# Plates "read" from each image; a None entry makes OCR fail for that file
+FAKE_OCR = {
+    "car1.jpg": ["MH12AB1234"],
+    "car2.png": ["XX99YY1234"],
+    "car3.jpeg": None,
+}
+
+def fake_extract(image_file, profile=None):
+    plates = FAKE_OCR[os.path.basename(image_file)]
+    if plates is None:
+        return {"success": False, "error": "OCR processing error: unreadable", "detected_plates": []}
+    return {"success": True, "raw_text": " ".join(plates), "detected_plates": plates}
+
+def test_reprocess_uploads():
+    print("=" * 50)
+    print("REPROCESS UPLOADS TEST")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        uploads = os.path.join(tmp, 'uploads')
+        os.mkdir(uploads)
+        for name in list(FAKE_OCR) + ["notes.txt"]:
+            with open(os.path.join(uploads, name), 'w') as f:
+                f.write("x")
+        os.mkdir(os.path.join(uploads, "folder.jpg"))
+        results_file = os.path.join(tmp, 'results.jsonl')
+        checkpoint_file = os.path.join(tmp, 'checkpoint.txt')
+
+        # Test 1: Only image files are picked up
+        print("\n[TEST 1] Finding uploads...")
+        found = find_uploads(uploads)
+        print(f"  Found: {found}")
+        assert found == ["car1.jpg", "car2.png", "car3.jpeg"]
+        assert find_uploads(os.path.join(tmp, 'missing')) == []
+
+        # The pool forks, so workers inherit these patches
+        patches = [
+            mock.patch.object(reprocess_uploads, 'extract_license_plate_from_image', side_effect=fake_extract),
+            mock.patch.object(reprocess_uploads, 'load_vehicle_snapshot', return_value={"MH12AB1234"}),
+            mock.patch.object(reprocess_uploads, 'load_verifications', return_value=[
+                {"filename": "car1.jpg", "is_authorized": False},
+                {"filename": "car2.png", "is_authorized": False},
+            ]),
+        ]
+        for p in patches:
+            p.start()
+        try:
+            # Test 2: First run processes everything and detects changed decisions
+            print("\n[TEST 2] First run...")
+            summary = reprocess(uploads, results_file, checkpoint_file, workers=2, chunksize=1)
+            print(f"  Processed: {summary['processed']} | Failed: {summary['failed']} | Changed: {summary['changed']}")
+            assert summary["pending"] == 3 and summary["processed"] == 3
+            assert summary["failed"] == 1
+            assert summary["changed"] == ["car1.jpg"]
+            with open(results_file) as f:
+                results = {r["filename"]: r for r in map(json.loads, f)}
+            assert results["car1.jpg"]["is_authorized"] and results["car1.jpg"]["previous_is_authorized"] is False
+            assert results["car2.png"]["plate"] == "XX99YY1234" and not results["car2.png"]["is_authorized"]
+            assert not results["car3.jpeg"]["success"]
+
+            # Test 3: Only successes are checkpointed, so the failure is retried
+            print("\n[TEST 3] Resuming from the checkpoint...")
+            assert load_checkpoint(checkpoint_file) == {"car1.jpg", "car2.png"}
+            FAKE_OCR["car3.jpeg"] = ["DL5CAB1234"]
+            summary = reprocess(uploads, results_file, checkpoint_file, workers=1)
+            print(f"  Skipped: {summary['skipped']} | Processed: {summary['processed']}")
+            assert summary["skipped"] == 2 and summary["processed"] == 1 and summary["failed"] == 0
+            assert load_checkpoint(checkpoint_file) == {"car1.jpg", "car2.png", "car3.jpeg"}
+
+            # Test 4: Nothing left to do
+            print("\n[TEST 4] Run with nothing pending...")
+            summary = reprocess(uploads, results_file, checkpoint_file, workers=1)
+            assert summary["pending"] == 0 and summary["processed"] == 0
+
+            # Test 5: An image deleted after listing is not blamed on Tesseract
+            print("\n[TEST 5] Missing image...")
+            reprocess_uploads._authorized_vehicles = {"MH12AB1234"}
+            result = process_upload((uploads, "gone.jpg", None))
+            print(f"  Error: {result['error']}")
+            assert not result["success"] and result["error"] == "Image not found: gone.jpg"
+        finally:
+            for p in patches:
+                p.stop()
+            FAKE_OCR["car3.jpeg"] = None
+
+    print("\n" + "=" * 50)
+    print("ALL TESTS COMPLETED SUCCESSFULLY!")
+    print("=" * 50)
+
+if __name__ == '__main__':
+    test_reprocess_uploads()
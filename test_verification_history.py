@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+"""
+Test script for the compact verification history structure.
+"""
+
+import json
+import os
+import tempfile
+from datetime import datetime
+
+from check_vehicle import VehicleValidator
+from verification_history import MISSING_TIMESTAMP, VerificationHistory, iter_log_records
+
+def make_history(count):
+    history = VerificationHistory()
+    for i in range(count):
+        # Authorized every third record, so flags differ on both sides of byte boundaries
+        history.append(f"2025-12-01T00:00:{i:02d}", f"PLATE{i % 4}", i % 3 == 0,
+                       f"img{i}.jpg" if i % 2 else None)
+    return history
+
+def test_verification_history():
+    print("=" * 50)
+    print("VERIFICATION HISTORY TEST")
+    print("=" * 50)
+
+    # Test 1: Bit-packed flags across byte boundaries
+    print("\n[TEST 1] Authorization flags across 8-record boundaries...")
+    history = make_history(20)
+    flags = [history.is_authorized(i) for i in range(len(history))]
+    print(f"  {''.join('1' if f else '0' for f in flags)}")
+    assert flags == [i % 3 == 0 for i in range(20)]
+    assert len(history._flags) == 3
+
+    # Test 2: Records round-trip through the column layout
+    print("\n[TEST 2] Materializing records...")
+    record = history[9]
+    print(f"  {record!r}")
+    assert record.plate == "PLATE1" and record.is_authorized and record.filename == "img9.jpg"
+    assert record.to_dict()["timestamp"] == "2025-12-01T00:00:09"
+    assert history[-1].plate == "PLATE3"
+    assert history[0].filename is None
+
+    # Test 3: Slicing and take keep flags and shared string tables
+    print("\n[TEST 3] Slicing and take...")
+    tail = history[6:15]
+    assert len(tail) == 9
+    assert [r.is_authorized for r in tail] == [i % 3 == 0 for i in range(6, 15)]
+    assert [r.filename for r in tail] == [f"img{i}.jpg" if i % 2 else None for i in range(6, 15)]
+    picked = history.take([19, 3, 8])
+    assert [r.plate for r in picked] == ["PLATE3", "PLATE3", "PLATE0"]
+    assert [r.is_authorized for r in picked] == [False, True, False]
+    print(f"  slice: {len(tail)} records, take: {len(picked)} records")
+
+    # Test 4: Filtering
+    print("\n[TEST 4] Filtering...")
+    matches = history.find(plate="plate1", is_authorized=True)
+    print(f"  PLATE1 authorized at indexes {matches}")
+    assert matches == [9]
+    assert history.find(plate="NOPE") == []
+    assert history.find(has_filename=False) == list(range(0, 20, 2))
+    assert history.find(start="2025-12-01T00:00:05", end="2025-12-01T00:00:08") == [5, 6, 7]
+    assert len(history.filter(is_authorized=False)) == 13
+
+    # Test 5: Missing timestamps
+    print("\n[TEST 5] Missing and invalid timestamps...")
+    odd = VerificationHistory.from_records([
+        {"timestamp": None, "plate": "AA11BB2222", "is_authorized": True, "filename": None},
+        {"timestamp": "Unknown", "plate": "AA11BB2222", "is_authorized": False, "filename": None},
+    ])
+    assert odd.timestamp_us(0) == MISSING_TIMESTAMP and odd.timestamp_us(1) == MISSING_TIMESTAMP
+    assert odd[0].timestamp is None and odd[0].date == 'Unknown'
+    assert odd[0].to_dict()["timestamp"] is None
+    # Range filters never match records without a timestamp
+    assert odd.find(start="2000-01-01") == [] and odd.find(end="2100-01-01") == []
+    print("  ✓ Missing timestamps handled")
+
+    # Test 6: Dashboard rows, newest first
+    print("\n[TEST 6] Dashboard rows...")
+    rows = history.rows(newest_first=True)
+    assert len(rows) == 20
+    assert rows[0] == ("img19.jpg", "2025-12-01", "PLATE3", False)
+    assert rows[-1] == (None, "2025-12-01", "PLATE0", True)
+    assert [r[2] for r in rows[:3]] == ["PLATE3", "PLATE2", "PLATE1"]
+    assert list(history.rows(newest_first=False))[0][2] == "PLATE0"
+    print(f"  First row: {rows[0]}")
+
+    # Test 7: VehicleValidator history file round-trip
+    print("\n[TEST 7] VehicleValidator history file round-trip...")
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            with open('vehicle_database.json', 'w') as f:
+                json.dump({"authorized_vehicles": ["MH12AB1234"]}, f)
+            with open('verification_history.json', 'w') as f:
+                json.dump([{"vehicle_number": "XX99YY1234", "status": "UNAUTHORIZED",
+                            "timestamp": "2025-12-01 08:30:00", "date": "2025-12-01"}], f)
+
+            validator = VehicleValidator()
+            assert validator.is_vehicle_authorized("mh12 ab1234")
+            with open('verification_history.json', 'r') as f:
+                saved = json.load(f)
+            print(f"  Saved entries: {len(saved)}")
+            assert saved[0] == {"vehicle_number": "XX99YY1234", "status": "UNAUTHORIZED",
+                                "timestamp": "2025-12-01 08:30:00", "date": "2025-12-01"}
+            assert saved[1]["vehicle_number"] == "MH12AB1234"
+            assert saved[1]["status"] == "AUTHORIZED"
+            assert saved[1]["date"] == datetime.strptime(saved[1]["timestamp"], "%Y-%m-%d %H:%M:%S").strftime("%Y-%m-%d")
+
+            reloaded = VehicleValidator()
+            assert reloaded.get_verification_history(10) == saved[::-1]
+        finally:
+            os.chdir(cwd)
+
+    # Test 8: Streaming the log file record by record
+    print("\n[TEST 8] Streaming verification_log.json...")
+    records = history.to_records()
+    records[3]["filename"] = 'odd ]}, "name".jpg'
+    with tempfile.TemporaryDirectory() as tmp:
+        log_file = os.path.join(tmp, 'verification_log.json')
+        with open(log_file, 'w') as f:
+            json.dump({"verifications": records}, f, indent=4)
+        # Tiny chunks force records to be split across reads
+        assert list(iter_log_records(log_file, chunk_size=7)) == records
+        streamed = VerificationHistory.from_log_file(log_file)
+        assert streamed.to_records() == records
+        # Other layouts fall back to a full parse
+        with open(log_file, 'w') as f:
+            json.dump({"version": 1, "verifications": records[:2]}, f)
+        assert list(iter_log_records(log_file)) == records[:2]
+    print(f"  ✓ {len(records)} records streamed")
+
+    print("\n" + "=" * 50)
+    print("ALL TESTS COMPLETED SUCCESSFULLY!")
+    print("=" * 50)
+
+if __name__ == '__main__':
+    test_verification_history()
@@ -0,0 +1,334 @@
+"""
+Compact in-memory representation of verification history.
+
+Instead of one dict per verification (plus a second list of tuples for the
+dashboard), records are stored column-wise:
+
+- timestamps as epoch microseconds in an ``array('q')``
+- plates as interned strings, referenced by integer ids
+- filenames (unique per upload, so interning wouldn't help) packed into a
+  single UTF-8 byte buffer with an offset array
+- the authorization flag bit-packed into a ``bytearray``
+
+Individual records are materialized on demand as ``VerificationRecord``
+objects (``__slots__``, no per-instance dict) or as the
+``(filename, date, plate, is_authorized)`` tuples the dashboard expects.
+"""
+
+import json
+import re
+import sys
+from array import array
+from collections.abc import Sequence
+from datetime import datetime, timedelta, timezone
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+# Stored for records whose timestamp is missing or unparsable
+MISSING_TIMESTAMP = -(2 ** 63)
+
+
+def to_epoch_us(value):
+    """Convert an ISO string, datetime or epoch-microsecond int to epoch microseconds."""
+    if value is None:
+        return MISSING_TIMESTAMP
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return MISSING_TIMESTAMP
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - _EPOCH) // _MICROSECOND
+
+
+_LOG_ARRAY_START = re.compile(r'\s*\{\s*"verifications"\s*:\s*\[')
+_WHITESPACE = re.compile(r'[\s,]*')
+
+
+def iter_log_records(log_file, chunk_size=64 * 1024):
+    """
+    Yield the records of a verification_log.json file one dict at a time.
+
+    The file is read in chunks and each record is decoded on its own, so the
+    whole log never exists as a list of dicts. Files that don't start with the
+    ``{"verifications": [`` layout written by save_verification are parsed
+    with json.load instead.
+    """
+    decoder = json.JSONDecoder()
+    with open(log_file, 'r') as f:
+        buffer = f.read(chunk_size)
+        eof = not buffer
+        match = _LOG_ARRAY_START.match(buffer)
+        while match is None and not eof and len(buffer) < chunk_size * 4:
+            more = f.read(chunk_size)
+            eof = not more
+            buffer += more
+            match = _LOG_ARRAY_START.match(buffer)
+        if match is None:
+            f.seek(0)
+            yield from json.load(f).get("verifications", [])
+            return
+
+        pos = match.end()
+        while True:
+            pos = _WHITESPACE.match(buffer, pos).end()
+            if pos < len(buffer) and buffer[pos] == ']':
+                return
+            try:
+                record, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # Record is split across chunks: keep the unread tail and read more
+                buffer = buffer[pos:]
+                pos = 0
+                more = f.read(chunk_size)
+                eof = not more
+                buffer += more
+                continue
+            yield record
+            pos = end
+
+
+def from_epoch_us(value):
+    """Convert epoch microseconds back to a naive datetime (None if missing)."""
+    if value == MISSING_TIMESTAMP:
+        return None
+    return _EPOCH + timedelta(microseconds=value)
+
+
+class VerificationRecord:
+    """A single verification, materialized from a VerificationHistory."""
+
+    __slots__ = ('timestamp_us', 'plate', 'is_authorized', 'filename')
+
+    def __init__(self, timestamp_us, plate, is_authorized, filename=None):
+        self.timestamp_us = timestamp_us
+        self.plate = plate
+        self.is_authorized = is_authorized
+        self.filename = filename
+
+    @property
+    def timestamp(self):
+        """Timestamp as a naive datetime, or None if it was not recorded."""
+        return from_epoch_us(self.timestamp_us)
+
+    @property
+    def date(self):
+        """Date part of the timestamp as YYYY-MM-DD (or 'Unknown')."""
+        ts = self.timestamp
+        return ts.date().isoformat() if ts else 'Unknown'
+
+    def to_dict(self):
+        """Return the record in the verification_log.json format."""
+        ts = self.timestamp
+        return {
+            "timestamp": ts.isoformat() if ts else None,
+            "plate": self.plate,
+            "is_authorized": self.is_authorized,
+            "filename": self.filename,
+        }
+
+    def to_row(self):
+        """Return the (filename, date, plate, is_authorized) tuple used by the dashboard."""
+        return (self.filename, self.date, self.plate, self.is_authorized)
+
+    def __repr__(self):
+        return (f"VerificationRecord(plate={self.plate!r}, is_authorized={self.is_authorized!r}, "
+                f"timestamp={self.timestamp!r}, filename={self.filename!r})")
+
+
+class _RowView(Sequence):
+    """Lazy sequence of dashboard tuples over a VerificationHistory."""
+
+    __slots__ = ('_history', '_newest_first')
+
+    def __init__(self, history, newest_first=True):
+        self._history = history
+        self._newest_first = newest_first
+
+    def __len__(self):
+        return len(self._history)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('row index out of range')
+        if self._newest_first:
+            index = len(self) - 1 - index
+        return self._history.record(index).to_row()
+
+
+class VerificationHistory:
+    """Column-oriented, append-only store of verification records."""
+
+    __slots__ = ('_timestamps', '_plate_ids', '_file_starts', '_file_lengths', '_flags', '_size',
+                 '_plates', '_plate_ids_by_name', '_file_blob')
+
+    def __init__(self):
+        self._timestamps = array('q')
+        self._plate_ids = array('I')
+        # Start offset into _file_blob, or -1 when no image was stored
+        self._file_starts = array('q')
+        self._file_lengths = array('I')
+        self._flags = bytearray()
+        self._size = 0
+        # Id 0 is reserved for "no plate"
+        self._plates = [None]
+        self._plate_ids_by_name = {}
+        self._file_blob = bytearray()
+
+    @classmethod
+    def from_records(cls, records):
+        """Build a history from verification_log.json style dicts."""
+        history = cls()
+        for r in records:
+            history.append(r.get('timestamp'), r.get('plate'),
+                           r.get('is_authorized', False), r.get('filename'))
+        return history
+
+    @classmethod
+    def from_log_file(cls, log_file):
+        """Build a history by streaming a verification_log.json file (see iter_log_records)."""
+        return cls.from_records(iter_log_records(log_file))
+
+    @staticmethod
+    def _intern(value, table, index):
+        if value is None:
+            return 0
+        value_id = index.get(value)
+        if value_id is None:
+            value_id = len(table)
+            value = sys.intern(value)
+            table.append(value)
+            index[value] = value_id
+        return value_id
+
+    def append(self, timestamp, plate, is_authorized, filename=None):
+        """Append one verification. ``timestamp`` may be an ISO string, datetime or epoch-us int."""
+        i = self._size
+        if i % 8 == 0:
+            self._flags.append(0)
+        if is_authorized:
+            self._flags[i >> 3] |= 1 << (i & 7)
+        self._timestamps.append(to_epoch_us(timestamp))
+        self._plate_ids.append(self._intern(plate, self._plates, self._plate_ids_by_name))
+        self._append_filename(filename)
+        self._size += 1
+
+    def _append_filename(self, filename):
+        if filename is None:
+            self._file_starts.append(-1)
+            self._file_lengths.append(0)
+            return
+        encoded = filename.encode('utf-8')
+        self._file_starts.append(len(self._file_blob))
+        self._file_lengths.append(len(encoded))
+        self._file_blob += encoded
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        for i in range(self._size):
+            yield self.record(i)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.take(range(*index.indices(self._size)))
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError('history index out of range')
+        return self.record(index)
+
+    def is_authorized(self, i):
+        """Authorization flag of record ``i``."""
+        return bool(self._flags[i >> 3] & (1 << (i & 7)))
+
+    def timestamp_us(self, i):
+        """Timestamp of record ``i`` in epoch microseconds."""
+        return self._timestamps[i]
+
+    def plate(self, i):
+        """Plate of record ``i``."""
+        return self._plates[self._plate_ids[i]]
+
+    def filename(self, i):
+        """Filename of record ``i`` (None if no image was stored)."""
+        start = self._file_starts[i]
+        if start < 0:
+            return None
+        return self._file_blob[start:start + self._file_lengths[i]].decode('utf-8')
+
+    def record(self, i):
+        """Materialize record ``i`` as a VerificationRecord."""
+        return VerificationRecord(self._timestamps[i], self._plates[self._plate_ids[i]],
+                                  self.is_authorized(i), self.filename(i))
+
+    def take(self, indexes):
+        """Return a new history containing only the given record indexes, in order."""
+        subset = VerificationHistory()
+        # String tables and the filename buffer are shared, so only the columns need copying
+        subset._plates = self._plates
+        subset._plate_ids_by_name = self._plate_ids_by_name
+        subset._file_blob = self._file_blob
+        for n, i in enumerate(indexes):
+            if n % 8 == 0:
+                subset._flags.append(0)
+            if self.is_authorized(i):
+                subset._flags[n >> 3] |= 1 << (n & 7)
+            subset._timestamps.append(self._timestamps[i])
+            subset._plate_ids.append(self._plate_ids[i])
+            subset._file_starts.append(self._file_starts[i])
+            subset._file_lengths.append(self._file_lengths[i])
+            subset._size += 1
+        return subset
+
+    def find(self, plate=None, is_authorized=None, start=None, end=None, has_filename=None):
+        """
+        Return the indexes of records matching all given filters.
+        ``start`` is inclusive and ``end`` exclusive; both accept anything to_epoch_us does.
+        """
+        plate_id = None
+        if plate is not None:
+            plate_id = self._plate_ids_by_name.get(plate.strip().upper().replace(" ", ""))
+            if plate_id is None:
+                return []
+        start_us = to_epoch_us(start) if start is not None else None
+        end_us = to_epoch_us(end) if end is not None else None
+
+        matches = []
+        for i in range(self._size):
+            if plate_id is not None and self._plate_ids[i] != plate_id:
+                continue
+            if is_authorized is not None and self.is_authorized(i) != is_authorized:
+                continue
+            if has_filename is not None and (self._file_starts[i] >= 0) != has_filename:
+                continue
+            ts = self._timestamps[i]
+            if start_us is not None and (ts == MISSING_TIMESTAMP or ts < start_us):
+                continue
+            if end_us is not None and (ts == MISSING_TIMESTAMP or ts >= end_us):
+                continue
+            matches.append(i)
+        return matches
+
+    def filter(self, **filters):
+        """Return a new history with the records matching ``find(**filters)``."""
+        return self.take(self.find(**filters))
+
+    def rows(self, newest_first=True):
+        """Lazy sequence of (filename, date, plate, is_authorized) tuples for the dashboard."""
+        return _RowView(self, newest_first)
+
+    def to_records(self):
+        """Return all records in the verification_log.json dict format."""
+        return [record.to_dict() for record in self]